@@ -1,14 +1,20 @@
 import cmd
-import json
-import random
-import string
+import os
 import sys
 from typing import Dict, List, Optional
 
+try:
+    import orjson as _json  # Optional C parser, much faster for scripted input
+except ImportError:
+    import json as _json
+
 from mempool import Mempool
 from transaction import Transaction
 from utxo import UTXOSet
 
+_SEP = "=" * 80
+_DASH = "-" * 80
+
 class MempoolCLI(cmd.Cmd):
     """Command-line interface for the Bitcoin mempool simulator."""
     
@@ -49,7 +55,7 @@ class MempoolCLI(cmd.Cmd):
                 print("Error: Transaction data required")
                 return
                 
-            data = json.loads(arg)
+            data = _json.loads(arg)
             txid = self._generate_txid()
             
             tx = Transaction(
@@ -66,16 +72,16 @@ class MempoolCLI(cmd.Cmd):
             else:
                 print(f"✗ {message}")
                 
-        except json.JSONDecodeError:
+        except _json.JSONDecodeError:
             print("Error: Invalid JSON format")
         except Exception as e:
             print(f"Error: {str(e)}")
     
     def do_show_mempool(self, _):
         """Show all transactions in the mempool."""
-        print("\n" + "="*80)
+        print("\n" + _SEP)
         print("MEMPOOL OVERVIEW".center(80))
-        print("="*80)
+        print(_SEP)
         
         # Show mempool info
         info = self.mempool.get_mempool_info()
@@ -84,37 +90,30 @@ class MempoolCLI(cmd.Cmd):
         
         # Show transactions sorted by fee rate
         print("\nTRANSACTIONS (sorted by fee rate):")
-        print("-" * 80)
+        print(_DASH)
         
         txs = self.mempool.get_transactions_by_fee_rate()
         if not txs:
             print("  Mempool is empty")
         else:
-            for i, tx in enumerate(txs, 1):
-                print(f"{i:3}. {tx.txid[:8]}... | Fee rate: {tx.fee_rate:>6.1f} sat/byte | Size: {tx.size:>5} bytes")
-                print(f"     Inputs:  {len(tx.inputs)}")
-                print(f"     Outputs: {len(tx.outputs)}")
+            # Format everything first and write it out in one go
+            sys.stdout.write('\n'.join(
+                f"{i:3}. {tx.txid[:8]}... | Fee rate: {tx.fee_rate:>6.1f} sat/byte | Size: {tx.size:>5} bytes\n"
+                f"     Inputs:  {len(tx.inputs)}\n"
+                f"     Outputs: {len(tx.outputs)}"
+                for i, tx in enumerate(txs, 1)
+            ) + '\n')
         
-        print("="*80 + "\n")
+        print(_SEP + "\n")
     
     def do_mine_top_block(self, arg):
         """Mine a block with the highest fee transactions."""
         try:
             max_size = int(arg) if arg.isdigit() else 1_000_000  # Default 1MB block
-            txs = self.mempool.get_transactions_by_fee_rate()
-            
-            block_size = 0
-            mined_txs = []
-            
-            for tx in txs:
-                if block_size + tx.size > max_size:
-                    break
-                mined_txs.append(tx)
-                block_size += tx.size
+            mined_txs, block_size = self.mempool.select_block(max_size)
             
             # Update UTXO set (in a real implementation, this would create new UTXOs)
-            for tx in mined_txs:
-                self.mempool._remove_transaction(tx.txid)
+            self.mempool.remove_many(tx.txid for tx in mined_txs)
             
             print(f"Mined block with {len(mined_txs)} transactions ({block_size} bytes)")
             
@@ -128,18 +127,20 @@ class MempoolCLI(cmd.Cmd):
     
     def do_show_utxos(self, _):
         """Show all UTXOs in the UTXO set."""
-        print("\n" + "="*80)
+        print("\n" + _SEP)
         print("UTXO SET OVERVIEW".center(80))
-        print("="*80)
+        print(_SEP)
         
         if not hasattr(self.utxo_set, 'utxos') or not self.utxo_set.utxos:
             print("No UTXOs in the set")
             return
         
-        for (txid, idx), output in self.utxo_set.utxos.items():
-            print(f"{txid[:8]}...:{idx:<3} -> {output['address']}: {output['amount']/1e8:.8f} BTC")
+        sys.stdout.write('\n'.join(
+            f"{txid[:8]}...:{idx:<3} -> {output['address']}: {output['amount']/1e8:.8f} BTC"
+            for (txid, idx), output in self.utxo_set.items()
+        ) + '\n')
         
-        print("="*80 + "\n")
+        print(_SEP + "\n")
     
     def do_help(self, arg):
         """Show help information."""
@@ -164,7 +165,7 @@ class MempoolCLI(cmd.Cmd):
     
     def _generate_txid(self, length=32):
         """Generate a random transaction ID."""
-        return ''.join(random.choices('0123456789abcdef', k=length))
+        return os.urandom(length // 2).hex()
 
 if __name__ == '__main__':
     try:
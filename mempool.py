@@ -1,12 +1,16 @@
-from typing import Dict, List, Set, Tuple
+import bisect
+import math
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from transaction import Transaction
+from utxo import UTXOSet
 
 class Mempool:
     """
     A Bitcoin-style mempool that manages unconfirmed transactions.
     Implements fee-based transaction prioritization and eviction.
     """
-    def __init__(self, max_size_mb: float = 1.0):
+    def __init__(self, max_size_mb: float = 1.0) -> None:
         """
         Initialize the mempool with a maximum size in MB.
         
@@ -17,12 +21,21 @@ class Mempool:
         self.current_size = 0
         # Maps txid to Transaction object
         self.transactions: Dict[str, Transaction] = {}
-        # Tracks which UTXOs are spent by mempool transactions
-        self.spent_utxos: Set[Tuple[str, int]] = set()
         # Maps UTXOs to the transactions that spend them
         self.utxo_to_tx: Dict[Tuple[str, int], str] = {}
+        # (-fee_rate, seq, txid) keys kept in ascending order, i.e. highest fee
+        # rate first and, within a fee rate, in order of arrival
+        self._by_fee: List[Tuple[float, int, str]] = []
+        # Maps txid to its exact key in _by_fee
+        self._fee_keys: Dict[str, Tuple[float, int, str]] = {}
+        # Admission counter used as the tie-break in _by_fee keys
+        self._seq = 0
+        # Transaction sizes, position for position with _by_fee
+        self._sizes: List[int] = []
+        # Transactions themselves, position for position with _by_fee
+        self._sorted: List[Transaction] = []
     
-    def add_transaction(self, tx: Transaction, utxo_set) -> Tuple[bool, str]:
+    def add_transaction(self, tx: Transaction, utxo_set: UTXOSet) -> Tuple[bool, str]:
         """
         Add a transaction to the mempool if it's valid.
         
@@ -32,14 +45,21 @@ class Mempool:
         # 1. Check if transaction already exists
         if tx.txid in self.transactions:
             return False, "Transaction already in mempool"
+        # NaN/inf fee rates can't be ordered and would corrupt the fee index
+        if not math.isfinite(tx.fee_rate):
+            return False, f"Invalid fee rate: {tx.fee_rate}"
         
-        # 2. Check for double spends within mempool
-        for inp in tx.inputs:
-            utxo_key = (inp['txid'], inp['index'])
-            if utxo_key in self.spent_utxos:
-                # Check if this is an RBF (Replace-By-Fee) case
-                if not self._is_valid_rbf(tx, utxo_key):
-                    return False, f"Double spend attempt: {utxo_key}"
+        # 2. Check for double spends within mempool, noting RBF candidates
+        old_txids = set()
+        for utxo_key in tx.inputs:
+            old_txid = self.utxo_to_tx.get(utxo_key)
+            # Each conflicting transaction only needs checking once
+            if old_txid is None or old_txid in old_txids:
+                continue
+            # Check if this is an RBF (Replace-By-Fee) case
+            if not self._is_valid_rbf(tx, self.transactions[old_txid]):
+                return False, f"Double spend attempt: {utxo_key}"
+            old_txids.add(old_txid)
         
         # 3. Validate against UTXO set
         valid, msg = utxo_set.validate_inputs(tx.inputs)
@@ -52,101 +72,148 @@ class Mempool:
             if not self._evict_for_space(tx.size):
                 return False, "Mempool full and cannot evict enough transactions"
         
-        # 5. If this is an RBF, remove the old transaction first
-        for inp in tx.inputs:
-            utxo_key = (inp['txid'], inp['index'])
-            if utxo_key in self.utxo_to_tx:
-                old_txid = self.utxo_to_tx[utxo_key]
-                self._remove_transaction(old_txid)
+        # 5. If this is an RBF, remove the old transactions first
+        for old_txid in old_txids:
+            self._remove_transaction(old_txid)
         
         # 6. Add the transaction
         self.transactions[tx.txid] = tx
         self.current_size += tx.size
+        key = (-tx.fee_rate, self._seq, tx.txid)
+        self._seq += 1
+        pos = bisect.bisect_right(self._by_fee, key)
+        self._by_fee.insert(pos, key)
+        self._fee_keys[tx.txid] = key
+        self._sizes.insert(pos, tx.size)
+        self._sorted.insert(pos, tx)
         
         # 7. Update spent UTXO tracking
-        for inp in tx.inputs:
-            utxo_key = (inp['txid'], inp['index'])
-            self.spent_utxos.add(utxo_key)
+        for utxo_key in tx.inputs:
             self.utxo_to_tx[utxo_key] = tx.txid
         
         return True, "Transaction added to mempool"
     
-    def _is_valid_rbf(self, new_tx: Transaction, utxo_key: Tuple[str, int]) -> bool:
-        """Check if a transaction is a valid RBF replacement."""
-        old_txid = self.utxo_to_tx.get(utxo_key)
-        if not old_txid:
-            return False
-            
-        old_tx = self.transactions.get(old_txid)
-        if not old_tx:
-            return False
-            
+    def _is_valid_rbf(self, new_tx: Transaction, old_tx: Transaction) -> bool:
+        """Check if a transaction is a valid RBF replacement of old_tx."""
         # Basic RBF rule: New transaction must have higher fee rate
         return new_tx.fee_rate > old_tx.fee_rate
     
     def _evict_for_space(self, required_space: int) -> bool:
-        """Evict lowest fee-rate transactions to make space."""
-        # Sort transactions by fee rate (ascending)
-        sorted_txs = sorted(
-            self.transactions.values(),
-            key=lambda tx: tx.fee_rate
-        )
+        """
+        Evict lowest fee-rate transactions until required_space fits.
+        
+        Returns False only if evicting everything still isn't enough.
+        """
+        # The fee index is ordered highest first, so the cheapest fee levels
+        # are at the end. Whole levels are dropped from the tail; if only part
+        # of a level has to go, its oldest arrivals (front of the level) go.
+        excess = self.current_size + required_space - self.max_size
+        tail = len(self._by_fee)
+        head_start = head_end = 0
+        while excess > 0 and tail > 0:
+            level = bisect.bisect_left(self._by_fee, (self._by_fee[tail - 1][0],), 0, tail)
+            level_size = sum(self._sizes[level:tail])
+            if level_size <= excess:
+                excess -= level_size
+                tail = level
+                continue
+            head_start = head_end = level
+            while excess > 0:
+                excess -= self._sizes[head_end]
+                head_end += 1
+            break
         
-        space_freed = 0
-        for tx in sorted_txs:
-            if self.current_size - space_freed + required_space <= self.max_size:
-                break
-                
-            self._remove_transaction(tx.txid)
-            space_freed += tx.size
+        evicted = self._by_fee[head_start:head_end] + self._by_fee[tail:]
+        for index in (self._by_fee, self._sizes, self._sorted):
+            del index[tail:]
+            del index[head_start:head_end]
+        for _, _, txid in evicted:
+            self._unlink_transaction(txid)
         
         return (self.current_size + required_space) <= self.max_size
     
-    def _remove_transaction(self, txid: str):
+    def _remove_transaction(self, txid: str) -> None:
         """Remove a transaction from the mempool."""
         if txid not in self.transactions:
             return
             
-        tx = self.transactions[txid]
+        pos = bisect.bisect_left(self._by_fee, self._fee_keys[txid])
+        del self._by_fee[pos]
+        del self._sizes[pos]
+        del self._sorted[pos]
+        
+        self._unlink_transaction(txid)
+    
+    def remove_many(self, txids: Iterable[str]) -> None:
+        """Remove several transactions from the mempool, e.g. once mined."""
+        txids = {txid for txid in txids if txid in self.transactions}
+        if not txids:
+            return
+        
+        # Rebuild the fee index in one pass instead of deleting entry by entry
+        keep = [i for i, key in enumerate(self._by_fee) if key[2] not in txids]
+        self._by_fee = [self._by_fee[i] for i in keep]
+        self._sizes = [self._sizes[i] for i in keep]
+        self._sorted = [self._sorted[i] for i in keep]
+        
+        for txid in txids:
+            self._unlink_transaction(txid)
+    
+    def _unlink_transaction(self, txid: str) -> None:
+        """Drop a transaction from everything except the fee index."""
+        tx = self.transactions.pop(txid)
+        del self._fee_keys[txid]
         self.current_size -= tx.size
         
         # Update spent UTXO tracking
-        for inp in tx.inputs:
-            utxo_key = (inp['txid'], inp['index'])
-            self.spent_utxos.discard(utxo_key)
+        for utxo_key in tx.inputs:
             self.utxo_to_tx.pop(utxo_key, None)
-        
-        del self.transactions[txid]
     
-    def get_transactions_by_fee_rate(self, limit: int = None) -> List[Transaction]:
+    def get_transactions_by_fee_rate(self, limit: Optional[int] = None) -> List[Transaction]:
         """Get transactions sorted by fee rate (highest first)."""
-        txs = sorted(
-            self.transactions.values(),
-            key=lambda tx: tx.fee_rate,
-            reverse=True
-        )
-        return txs[:limit] if limit is not None else txs
+        return self._sorted[:limit]
+    
+    def select_block(self, max_size: int) -> Tuple[List[Transaction], int]:
+        """
+        Select the highest fee-rate transactions that fit in a block.
+        
+        Returns:
+            tuple: (transactions: list, block_size: int)
+        """
+        # Running block size after each tx; the block is the prefix that fits
+        cumulative = list(accumulate(self._sizes))
+        cut = bisect.bisect_right(cumulative, max_size)
+        block_size = cumulative[cut - 1] if cut else 0
+        return self.get_transactions_by_fee_rate(cut), block_size
+    
+    def stats(self) -> Tuple[int, int, int]:
+        """Get raw mempool statistics: (current_size, max_size, tx_count)."""
+        return self.current_size, self.max_size, len(self.transactions)
     
-    def get_mempool_info(self) -> dict:
-        """Get mempool statistics."""
+    def get_mempool_info(self) -> Dict[str, Any]:
+        """Get mempool statistics formatted for display."""
+        size, max_size, tx_count = self.stats()
         return {
-            'size': self.current_size,
-            'bytes': f"{self.current_size:,} bytes",
-            'max_size': f"{self.max_size:,} bytes",
-            'usage': f"{(self.current_size / self.max_size * 100):.1f}%",
-            'tx_count': len(self.transactions)
+            'size': size,
+            'bytes': f"{size:,} bytes",
+            'max_size': f"{max_size:,} bytes",
+            'usage': f"{(size / max_size * 100):.1f}%",
+            'tx_count': tx_count
         }
     
-    def clear(self):
+    def clear(self) -> None:
         """Clear all transactions from the mempool."""
         self.transactions.clear()
-        self.spent_utxos.clear()
         self.utxo_to_tx.clear()
+        self._by_fee.clear()
+        self._fee_keys.clear()
+        self._sizes.clear()
+        self._sorted.clear()
         self.current_size = 0
     
     def __repr__(self) -> str:
-        info = self.get_mempool_info()
+        size, max_size, tx_count = self.stats()
         return (
-            f"<Mempool: {info['tx_count']} transactions, "
-            f"{info['bytes']} ({info['usage']} of {info['max_size']})>"
+            f"<Mempool: {tx_count} transactions, "
+            f"{size:,} bytes ({size / max_size:.1%} of {max_size:,} bytes)>"
         )
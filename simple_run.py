@@ -1,31 +1,36 @@
 import json
-import random
-import string
+import os
+import sys
 from mempool import Mempool
 from transaction import Transaction
 from utxo import UTXOSet
 
+_SEP = "=" * 80
+_DASH = "-" * 80
+
 def generate_txid():
     """Generate a random transaction ID."""
-    return 'tx_' + ''.join(random.choices(string.hexdigits, k=16)).lower()
+    return 'tx_' + os.urandom(8).hex()
 
 def show_utxos(utxo_set):
     """Display all UTXOs."""
-    print("\n" + "="*80)
+    print("\n" + _SEP)
     print("UNSPENT TRANSACTION OUTPUTS (UTXOs)".center(80))
-    print("-" * 80)
+    print(_DASH)
     if not utxo_set.utxos:
         print("No UTXOs available")
     else:
-        for (txid, idx), output in utxo_set.utxos.items():
-            print(f"{txid}:{idx} -> {output['address']}: {output['amount']/1e8:.8f} BTC")
-    print("="*80 + "\n")
+        sys.stdout.write('\n'.join(
+            f"{txid}:{idx} -> {output['address']}: {output['amount']/1e8:.8f} BTC"
+            for (txid, idx), output in utxo_set.items()
+        ) + '\n')
+    print(_SEP + "\n")
 
 def show_mempool(mempool):
     """Display mempool contents."""
-    print("\n" + "="*80)
+    print("\n" + _SEP)
     print("MEMPOOL CONTENTS".center(80))
-    print("-" * 80)
+    print(_DASH)
     
     info = mempool.get_mempool_info()
     print(f"Transactions: {info['tx_count']}")
@@ -36,22 +41,27 @@ def show_mempool(mempool):
         print("\nMempool is empty")
     else:
         print("\nTransactions (sorted by fee rate):")
-        for i, tx in enumerate(txs, 1):
-            print(f"{i:3}. {tx.txid[:8]}... | Fee rate: {tx.fee_rate:>6.1f} sat/byte | "
-                  f"Size: {tx.size:>5} bytes | Inputs: {len(tx.inputs)} | Outputs: {len(tx.outputs)}")
+        sys.stdout.write('\n'.join(
+            f"{i:3}. {tx.txid[:8]}... | Fee rate: {tx.fee_rate:>6.1f} sat/byte | "
+            f"Size: {tx.size:>5} bytes | Inputs: {len(tx.inputs)} | Outputs: {len(tx.outputs)}"
+            for i, tx in enumerate(txs, 1)
+        ) + '\n')
     
-    print("="*80 + "\n")
+    print(_SEP + "\n")
 
 def add_transaction(mempool, utxo_set):
     """Add a new transaction to the mempool."""
     print("\nAdd a new transaction")
-    print("-" * 80)
+    print(_DASH)
     
     # Show available UTXOs
     print("\nAvailable UTXOs:")
-    utxo_list = list(utxo_set.utxos.items())
-    for i, ((txid, idx), output) in enumerate(utxo_list, 1):
-        print(f"{i}. {txid}:{idx} -> {output['amount']/1e8:.8f} BTC")
+    utxo_list = list(utxo_set.items())
+    if utxo_list:
+        sys.stdout.write('\n'.join(
+            f"{i}. {txid}:{idx} -> {output['amount']/1e8:.8f} BTC"
+            for i, ((txid, idx), output) in enumerate(utxo_list, 1)
+        ) + '\n')
     
     try:
         # Get inputs
@@ -135,19 +145,10 @@ def mine_block(mempool, utxo_set):
         max_size = input("Enter maximum block size in bytes (default: 1000000): ").strip()
         max_size = int(max_size) if max_size.isdigit() else 1000000
         
-        txs = mempool.get_transactions_by_fee_rate()
-        block_size = 0
-        mined_txs = []
-        
-        for tx in txs:
-            if block_size + tx.size > max_size:
-                break
-            mined_txs.append(tx)
-            block_size += tx.size
+        mined_txs, block_size = mempool.select_block(max_size)
         
         # In a real implementation, we'd create new UTXOs here
-        for tx in mined_txs:
-            mempool._remove_transaction(tx.txid)
+        mempool.remove_many(tx.txid for tx in mined_txs)
         
         print(f"\nMined block with {len(mined_txs)} transactions ({block_size} bytes)")
         
@@ -156,9 +157,9 @@ def mine_block(mempool, utxo_set):
 
 def show_help():
     """Show help information."""
-    print("\n" + "="*80)
+    print("\n" + _SEP)
     print("BITCOIN MEMPOOL SIMULATOR - HELP".center(80))
-    print("="*80)
+    print(_SEP)
     print("\nAvailable Commands:")
     print(" 1. Show UTXOs")
     print(" 2. Show Mempool")
@@ -167,13 +168,13 @@ def show_help():
     print(" 5. Clear Mempool")
     print(" 6. Help")
     print(" 0. Exit")
-    print("\n" + "="*80 + "\n")
+    print("\n" + _SEP + "\n")
 
 def main():
-    print("\n" + "="*80)
+    print("\n" + _SEP)
     print("BITCOIN MEMPOOL SIMULATOR".center(80))
     print("Type 'help' for available commands".center(80))
-    print("="*80 + "\n")
+    print(_SEP + "\n")
     
     # Initialize components
     utxo_set = UTXOSet()
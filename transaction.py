@@ -1,8 +1,15 @@
+import sys
+from typing import Any, Dict, List, Tuple
+
+
 class Transaction:
     """
     Represents a Bitcoin-style transaction with inputs and outputs.
     """
-    def __init__(self, txid, inputs, outputs, fee_rate):
+    __slots__ = ('txid', 'inputs', 'outputs', 'fee_rate', 'size')
+    
+    def __init__(self, txid: str, inputs: List[Dict[str, Any]], outputs: List[Dict[str, Any]],
+                 fee_rate: float) -> None:
         """
         Initialize a transaction.
         
@@ -12,18 +19,24 @@ class Transaction:
             outputs (list): List of output dictionaries with address and amount
             fee_rate (float): Fee rate in satoshis per byte (approximate)
         """
-        self.txid = txid
-        self.inputs = inputs  # List of {'txid': str, 'index': int}
-        self.outputs = outputs  # List of {'address': str, 'amount': int}
-        self.fee_rate = fee_rate
-        self.size = self._estimate_size()
+        # Txids are interned so every reference to one shares a single string
+        self.txid: str = sys.intern(txid)
+        # Stored compactly as (txid, index) and (address, amount) tuples
+        self.inputs: Tuple[Tuple[str, int], ...] = tuple(
+            (sys.intern(inp['txid']), inp['index']) for inp in inputs
+        )
+        self.outputs: Tuple[Tuple[str, int], ...] = tuple(
+            (out['address'], out['amount']) for out in outputs
+        )
+        self.fee_rate: float = fee_rate
+        self.size: int = self._estimate_size()
     
-    def _estimate_size(self):
+    def _estimate_size(self) -> int:
         """Estimate transaction size in bytes (simplified)"""
         # Rough estimation: 10 bytes per input, 34 bytes per output
         input_size = len(self.inputs) * 10
         output_size = len(self.outputs) * 34
         return input_size + output_size + 10  # +10 for overhead
     
-    def __repr__(self):
+    def __repr__(self) -> str:
         return f"Transaction({self.txid[:8]}..., fee_rate={self.fee_rate} sat/byte)"
@@ -1,45 +1,82 @@
+import sys
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Iterator, Optional, Sequence, Tuple
+
+
 class UTXOSet:
     """
     Manages the set of Unspent Transaction Outputs (UTXOs).
     """
-    def __init__(self):
-        # Maps (txid, index) to output details
-        self.utxos = {}
+    def __init__(self) -> None:
+        # Maps txid to {index: output details}; outputs of one tx share a bucket
+        self.utxos: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._count = 0
+        # Maps address to {(txid, index): amount} for that address's UTXOs
+        self.by_address: DefaultDict[str, Dict[Tuple[str, int], int]] = defaultdict(dict)
     
-    def add_utxo(self, txid, index, output):
+    def add_utxo(self, txid: str, index: int, output: Dict[str, Any]) -> None:
         """Add a new UTXO to the set."""
-        self.utxos[(txid, index)] = output
+        txid = sys.intern(txid)
+        bucket = self.utxos.setdefault(txid, {})
+        if index in bucket:
+            self._unindex((txid, index), bucket[index])
+        else:
+            self._count += 1
+        bucket[index] = output
+        self.by_address[output['address']][(txid, index)] = output['amount']
     
-    def spend_utxo(self, txid, index):
+    def spend_utxo(self, txid: str, index: int) -> Optional[Dict[str, Any]]:
         """Mark a UTXO as spent and return it if it exists."""
-        return self.utxos.pop((txid, index), None)
+        bucket = self.utxos.get(txid)
+        if bucket is None:
+            return None
+        output = bucket.pop(index, None)
+        if output is not None:
+            self._count -= 1
+            self._unindex((txid, index), output)
+        if not bucket:
+            del self.utxos[txid]
+        return output
     
-    def get_utxo(self, txid, index):
+    def _unindex(self, key: Tuple[str, int], output: Dict[str, Any]) -> None:
+        """Remove a UTXO from the address index."""
+        owned = self.by_address[output['address']]
+        owned.pop(key, None)
+        if not owned:
+            del self.by_address[output['address']]
+    
+    def get_utxo(self, txid: str, index: int) -> Optional[Dict[str, Any]]:
         """Get a UTXO if it exists and is unspent."""
-        return self.utxos.get((txid, index))
+        bucket = self.utxos.get(txid)
+        return bucket.get(index) if bucket is not None else None
+    
+    def items(self) -> Iterator[Tuple[Tuple[str, int], Dict[str, Any]]]:
+        """Iterate over ((txid, index), output) pairs."""
+        for txid, bucket in self.utxos.items():
+            for index, output in bucket.items():
+                yield (txid, index), output
     
-    def validate_inputs(self, inputs):
+    def validate_inputs(self, inputs: Sequence[Tuple[str, int]]) -> Tuple[bool, str]:
         """
-        Validate that all inputs exist in the UTXO set.
+        Validate that all (txid, index) inputs exist in the UTXO set.
         
         Returns:
             tuple: (bool, str) - (is_valid, error_message)
         """
-        for inp in inputs:
-            if (inp['txid'], inp['index']) not in self.utxos:
-                return False, f"Input {inp['txid']}:{inp['index']} not found in UTXO set"
+        utxos = self.utxos
+        for txid, index in inputs:
+            bucket = utxos.get(txid)
+            if bucket is None or index not in bucket:
+                return False, f"Input {txid}:{index} not found in UTXO set"
         return True, ""
     
-    def get_balance(self, address):
+    def get_balance(self, address: str) -> int:
         """Get total balance for a given address."""
-        return sum(
-            output['amount'] 
-            for output in self.utxos.values() 
-            if output['address'] == address
-        )
+        owned = self.by_address.get(address)
+        return sum(owned.values()) if owned else 0
     
-    def __len__(self):
-        return len(self.utxos)
+    def __len__(self) -> int:
+        return self._count
     
-    def __repr__(self):
+    def __repr__(self) -> str:
         return f"<UTXOSet: {len(self)} unspent outputs>"